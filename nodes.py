@@ -1,16 +1,38 @@
 import json
 import os
+import hashlib
+import mmap
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import sys
 import logging
-from tqdm import tqdm
-import re
 import folder_paths
 from pathlib import Path
+from urllib.parse import urlparse
+from email.message import Message
+from email.utils import collapse_rfc2231_value
 import importlib.util
+import threading
+import time
+from concurrent.futures import Future, wait
 from nodes import LoraLoader, UNETLoader, CheckpointLoaderSimple, VAELoader, CLIPLoader,  ControlNetLoader
 
+try:
+    # Optional faster JSON parser, raises a json.JSONDecodeError subclass like the stdlib
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 LOG_PREFIX = "[ComfyUI-OnDemand-Loaders]"
+DEFAULT_DOWNLOAD_CHUNKS = 4
+DEFAULT_DOWNLOAD_CONNECTIONS = 4
+PREFETCH_WORKERS = 2
+HTTP_POOL_SIZE = 16
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+RANGE_ATTEMPTS = 3
+CACHE_INDEX_FILENAME = ".ondemand_cache.json"
 
 
 logger = logging.getLogger(__name__)
@@ -50,7 +72,34 @@ else:
     logger.warning(f"OnDemand GGUF Loaders will not be available")
 
 
-# Function to load configuration 
+# Shared session, so loaders in the same workflow reuse kept-alive connections
+# instead of paying a new TCP+TLS handshake for every request.
+# Transient connection errors and 429/5xx answers are retried with exponential backoff.
+_SESSION = requests.Session()
+_HTTP_RETRY = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET", "HEAD"])
+_HTTP_ADAPTER = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=_HTTP_RETRY)
+_SESSION.mount("https://", _HTTP_ADAPTER)
+_SESSION.mount("http://", _HTTP_ADAPTER)
+
+
+# Parsed configurations by path, as (st_mtime_ns, config)
+_CONFIG_CACHE = {}
+
+# Fallback configuration, a single object so the node name lists built from it are reused
+DEFAULT_CONFIG = { 
+    "loras": [
+        {
+            "name": "Lora n1",
+            "url": "not_valid_url",
+        },
+        {
+            "name": "Lora n2",
+            "url": "not_valid_url"
+        }
+    ]
+}
+
+# Function to load configuration, the file is only parsed again once it changes
 def load_config(config_filename="config.json"):
     
     config_path_env = os.environ.get('ONDEMAND_LOADERS_CONFIG_PATH')
@@ -61,22 +110,14 @@ def load_config(config_filename="config.json"):
         current_dir = os.path.dirname(__file__)
         config_path = os.path.join(current_dir, config_filename)
     
-    default_config = { 
-        "loras": [
-            {
-                "name": "Lora n1",
-                "url": "not_valid_url",
-            },
-            {
-                "name": "Lora n2",
-                "url": "not_valid_url"
-            }
-        ]
-    }
-
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        config_mtime = os.stat(config_path).st_mtime_ns
+        cached = _CONFIG_CACHE.get(config_path)
+        if cached and cached[0] == config_mtime:
+            return cached[1]
+
+        with open(config_path, 'rb') as f:
+            config = _json_loads(f.read())
         logger.info(f"Successfully loaded configuration from {config_filename}")
 
         # add None to all lists
@@ -86,16 +127,17 @@ def load_config(config_filename="config.json"):
                 if none_entry not in config[key]:
                     config[key].insert(0, none_entry)
 
+        _CONFIG_CACHE[config_path] = (config_mtime, config)
         return config
     except FileNotFoundError:
         logger.warning(f"Configuration file '{config_path}' not found. Using default fallback configuration.")
-        return default_config
+        return DEFAULT_CONFIG
     except json.JSONDecodeError:
         logger.error(f"Error decoding JSON from '{config_path}'. Using default fallback configuration.")
-        return default_config
+        return DEFAULT_CONFIG
     except Exception as e:
         logger.error(f"An unexpected error occurred while loading '{config_path}': {e}. Using default fallback.")
-        return default_config
+        return DEFAULT_CONFIG
 
 def _get_api_key_for_url(model_url, api_key_param):
     """
@@ -110,90 +152,894 @@ def _get_api_key_for_url(model_url, api_key_param):
         return api_key_param # Return provided key if URL doesn't match known platforms
 
 
-def _download_model(model_url, model_name, destination_dir, api_key, download_chunks):
+def _filename_from_url(model_url):
+    """
+    Derives a filename from the path of the model_url, ignoring any query string.
+    Falls back to a hash of the url when the path has no usable basename.
+    """
+    model_filename = os.path.basename(urlparse(model_url).path)
+    if not model_filename:
+        model_filename = hashlib.sha256(model_url.encode("utf-8")).hexdigest()
+    return model_filename
+
+
+def _filename_from_response(response):
+    """
+    Extracts the filename from the Content-Disposition header of a response, if any.
+    Both the plain 'filename' and the RFC 6266 'filename*' (e.g. UTF-8'') forms are supported.
+    """
+    content_disposition = response.headers.get('Content-Disposition')
+    if not content_disposition:
+        return None
+
+    message = Message()
+    message['Content-Disposition'] = content_disposition
+    filenames = [value for key, value in message.get_params([], header='content-disposition') if key == 'filename']
+    if not filenames:
+        return None
+
+    # The extended 'filename*' form is parsed as a (charset, language, value) tuple and takes precedence
+    filenames.sort(key=lambda value: not isinstance(value, tuple))
+    model_filename = collapse_rfc2231_value(filenames[0]).strip()
+    try:
+        # Header values are decoded as latin-1, recover UTF-8 filenames sent in the plain form
+        model_filename = model_filename.encode('latin-1').decode('utf-8')
+    except UnicodeError:
+        pass
+    # Never let the server pick a location outside of the destination directory
+    return os.path.basename(model_filename) or None
+
+
+def _request_model(model_url, model_name, headers, offset=0, etag=None):
+    """
+    Issues the streaming GET for a model. When offset is set, only the bytes after
+    offset are requested, the caller must check for a 206 status before appending.
+    With the ETag the partial file was downloaded with, the server sends the whole
+    file instead if it changed since.
+
+    Returns:
+        requests.Response: The open streaming response, or None if an error occurred.
+    """
+    request_headers = dict(headers)
+    if offset:
+        request_headers["Range"] = f"bytes={offset}-"
+        # Weak ETags are never equal in an If-Range comparison, they would prevent any resume
+        if etag and not etag.startswith("W/"):
+            request_headers["If-Range"] = etag
+
+    try:
+        response = _SESSION.get(model_url, stream=True, allow_redirects=True, headers=request_headers)
+        if offset and (response.status_code == 416 or (response.status_code == 206 and not
+                       response.headers.get('Content-Range', '').startswith(f"bytes {offset}-"))):
+            # The partial file doesn't match the remote file, start over from the first byte
+            logger.warning(f"Cannot resume download of '{model_name}', restarting from scratch.")
+            response.close()
+            return _request_model(model_url, model_name, headers)
+        response.raise_for_status()  # Raise an exception for bad status codes
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error making request for '{model_name}' from '{model_url}': {e}")
+        return None
+    return response
+
+
+def _resume_offset(part_filepath, accept_ranges):
+    """
+    Returns the number of bytes already downloaded to part_filepath, or 0 when the
+    server doesn't support range requests or part_filepath holds parallel ranges,
+    whose preallocated size says nothing about the bytes received.
+    """
+    if accept_ranges and os.path.exists(part_filepath) and "ranges" not in _load_part_state(part_filepath):
+        return os.path.getsize(part_filepath)
+    return 0
+
+
+def _load_part_state(part_filepath):
+    """
+    Loads the state recorded next to a partial download, e.g. the ETag of the remote file
+    it was started from, or {} if there is none.
+    """
+    try:
+        with open(part_filepath + ".json", 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_part_state(part_filepath, part_state):
+    """
+    Atomically records the state of a partial download next to it.
+    """
+    with open(part_filepath + ".json.tmp", 'w') as f:
+        json.dump(part_state, f)
+    os.replace(part_filepath + ".json.tmp", part_filepath + ".json")
+
+
+def _remove_part(part_filepath):
+    """
+    Removes a partial download along with its recorded state.
+    """
+    for filepath in (part_filepath, part_filepath + ".json"):
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+
+class _NoProgressBar:
+    """
+    Stand-in for tqdm when the progress isn't displayed.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def update(self, n=1):
+        pass
+
+    def close(self):
+        pass
+
+
+def _progress_bar(total_size, model_name, initial=0):
+    """
+    Creates the console progress bar of a download. It is disabled when ComfyUI runs
+    without a terminal, and redraws at most once per second otherwise.
+    tqdm is only imported once a progress bar is actually displayed.
+    """
+    # tqdm draws on stderr, that is the stream which must be a terminal
+    isatty = getattr(sys.stderr, 'isatty', None)
+    if not (isatty and isatty()):
+        return _NoProgressBar()
+
+    from tqdm import tqdm
+    return tqdm(total=total_size, initial=initial, unit='iB', unit_scale=True, desc=f"{LOG_PREFIX} Downloading {model_name}",
+                mininterval=1.0, file=sys.stderr)
+
+
+def _drop_page_cache(filepath):
+    """
+    Flushes a freshly downloaded file and advises the kernel to drop it from the page
+    cache, so a multi-GB download doesn't evict everything else that is cached.
+    Only dirty pages written back to disk can be dropped, hence the fdatasync first.
+    This only pays off for files that aren't about to be loaded, e.g. prefetched models.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.debug(f"Could not drop '{filepath}' from the page cache: {e}")
+
+
+def _available_memory():
+    """
+    Returns the memory available for new allocations and the page cache in bytes,
+    or None if it can't be determined on this platform.
+    """
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _prefetch_model(filepath):
+    """
+    Advises the kernel that filepath is about to be read sequentially, so the readahead
+    of the model overlaps with the ComfyUI loader parsing its first bytes.
+    Files that don't fit comfortably in the available memory are left alone, reading
+    them ahead would only evict their own first pages and everything else cached.
+    """
+    if not hasattr(mmap, 'MADV_WILLNEED'):
+        return
+    file_size = os.path.getsize(filepath)
+    available_memory = _available_memory()
+    if file_size == 0 or available_memory is None or file_size > available_memory // 2:
+        return
+    try:
+        with open(filepath, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+                mm.madvise(mmap.MADV_WILLNEED)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Could not prefetch '{filepath}': {e}")
+
+
+def _preallocate(f, size):
+    """
+    Reserves size bytes on disk for an open file in a single allocation, which avoids
+    fragmenting multi-GB models into thousands of extents.
+
+    Returns:
+        bool: True if the space was preallocated, False if unsupported on this platform or filesystem.
+    """
+    if not hasattr(os, 'posix_fallocate'):
+        return False
+    try:
+        os.posix_fallocate(f.fileno(), 0, size)
+        return True
+    except OSError as e:
+        logger.debug(f"Could not preallocate {size} bytes: {e}")
+        return False
+
+
+def _download_ranges(model_url, model_name, headers, part_filepath, total_size, connections, block_size, etag=None, pending=None):
+    """
+    Downloads a model by splitting it into byte ranges that are fetched concurrently,
+    each one written into its own slice of a preallocated file.
+
+    The [start, end] bytes still missing from every range are recorded next to the file
+    as they are written. A range interrupted mid-body is requested again from where it
+    stopped, and a download that fails anyway is resumed on a later run by passing the
+    recorded ranges back as pending.
+
+    Args:
+        model_url (str): The URL of the model to download.
+        model_name (str): The name of the model (for logging purposes).
+        headers (dict): Request headers, including authentication if required.
+        part_filepath (str): The file the model is written to.
+        total_size (int): The size of the model in bytes, as reported by the server.
+        connections (int): The number of concurrent range requests.
+        block_size (int): The size of download chunks in bytes.
+        etag (str): The ETag of the remote file, every range must come from that same file.
+        pending (list): The ranges still missing from an earlier attempt, or None to start over.
+
+    Raises:
+        Exception: If any of the ranges fails or is incomplete.
+    """
+    if pending is None:
+        range_size = -(-total_size // connections)
+        pending = [[start, min(start + range_size, total_size) - 1] for start in range(0, total_size, range_size)]
+        with open(part_filepath, 'wb') as f:
+            if not _preallocate(f, total_size):
+                f.truncate(total_size)
+    part_state = {"etag": etag, "size": total_size, "ranges": pending}
+    _save_part_state(part_filepath, part_state)
+
+    progress_lock = threading.Lock()
+    failed = threading.Event()
+
+    def download_range(index, progress_bar):
+        end = pending[index][1]
+        error = None
+        for attempt in range(RANGE_ATTEMPTS):
+            start = pending[index][0]
+            if start > end:
+                return
+            if error:
+                logger.warning(f"Range {start}-{end} of '{model_name}' was interrupted ({error}), retrying from byte {start}.")
+            range_headers = {**headers, "Range": f"bytes={start}-{end}"}
+            if etag and not etag.startswith("W/"):
+                range_headers["If-Range"] = etag
+            try:
+                with _SESSION.get(model_url, stream=True, allow_redirects=True, headers=range_headers) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206 or not response.headers.get('Content-Range', '').startswith(f"bytes {start}-"):
+                        raise requests.exceptions.RequestException(f"Server ignored range {start}-{end} (status {response.status_code})")
+                    with open(part_filepath, 'r+b', buffering=WRITE_BUFFER_SIZE) as f:
+                        f.seek(start)
+                        for data in response.iter_content(block_size):
+                            if failed.is_set():
+                                return
+                            f.write(data)
+                            # Only bytes handed over to the OS are recorded as downloaded
+                            f.flush()
+                            start += len(data)
+                            with progress_lock:
+                                progress_bar.update(len(data))
+                                pending[index][0] = start
+                                _save_part_state(part_filepath, part_state)
+                error = f"{end - start + 1} bytes missing"
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                error = e
+        raise IOError(f"Range {pending[index][0]}-{end} is incomplete after {RANGE_ATTEMPTS} attempts: {error}")
+
+    errors = []
+
+    def download_range_or_stop(*args):
+        try:
+            download_range(*args)
+        except Exception as e:
+            errors.append(e)
+            failed.set()
+
+    missing_size = sum(end - start + 1 for start, end in pending if start <= end)
+    with _progress_bar(total_size, model_name, initial=total_size - missing_size) as progress_bar:
+        # Unlike ThreadPoolExecutor workers, which are joined at interpreter exit, daemon threads
+        # let ComfyUI shut down in the middle of a multi-GB download, the recorded ranges resume it later
+        workers = [threading.Thread(target=download_range_or_stop, args=(index, progress_bar), daemon=True)
+                   for index in range(len(pending))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    if errors:
+        raise errors[0]
+
+
+# Serializes updates of the per-directory cache index files
+_CACHE_INDEX_LOCK = threading.Lock()
+
+
+def _load_cache_index(destination_dir):
+    """
+    Loads the cache index of a models directory, recording the origin url, size and
+    ETag of every file downloaded by these nodes as {filename: entry}.
+    """
+    try:
+        with open(os.path.join(destination_dir, CACHE_INDEX_FILENAME), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read the cache index of '{destination_dir}', ignoring it: {e}")
+        return {}
+
+
+def _save_cache_index(destination_dir, cache_index):
+    """
+    Atomically replaces the cache index of a models directory.
+    """
+    index_filepath = os.path.join(destination_dir, CACHE_INDEX_FILENAME)
+    with open(index_filepath + ".tmp", 'w') as f:
+        json.dump(cache_index, f, indent=4)
+    os.replace(index_filepath + ".tmp", index_filepath)
+
+
+def _cached_filename_for_url(destination_dir, model_url):
+    """
+    Returns the filename a model_url was previously downloaded to, or None if unknown.
+    """
+    for model_filename, entry in _load_cache_index(destination_dir).items():
+        if entry.get("url") == model_url:
+            return model_filename
+    return None
+
+
+def _cached_model_filepath(destination_dir, model_filename, expected_sha256=None):
+    """
+    Returns the path of model_filename in destination_dir if it is present and intact, or None.
+
+    Files recorded in the cache index must match their recorded size, and the SHA256
+    computed while downloading them must match expected_sha256 when both are known.
+    Otherwise they are removed so they get downloaded again. When a cache budget is set,
+    the access time of a cache hit is refreshed, so the LRU sweep works on filesystems
+    mounted with noatime.
+    """
+    model_filepath = os.path.join(destination_dir, model_filename)
+    if not os.path.exists(model_filepath):
+        return None
+
+    entry = _load_cache_index(destination_dir).get(model_filename)
+    if entry and entry.get("size") is not None and os.path.getsize(model_filepath) != entry["size"]:
+        logger.warning(f"File '{model_filename}' doesn't match its recorded size, it will be downloaded again.")
+        os.remove(model_filepath)
+        return None
+    if entry and expected_sha256 and entry.get("sha256") and entry["sha256"] != expected_sha256.lower():
+        logger.warning(f"File '{model_filename}' doesn't match the configured SHA256, it will be downloaded again.")
+        os.remove(model_filepath)
+        return None
+
+    if _get_setting_from_config("cache_budget_gb", 0):
+        try:
+            os.utime(model_filepath, (time.time(), os.path.getmtime(model_filepath)))
+        except OSError as e:
+            logger.debug(f"Could not refresh the access time of '{model_filepath}': {e}")
+    logger.info(f"File '{model_filename}' already exists at '{model_filepath}'. Skipping download.")
+    return model_filepath
+
+
+def _enforce_cache_budget(destination_dir, budget_bytes, keep=()):
+    """
+    Evicts the least recently used downloaded models until the files in destination_dir
+    fit in budget_bytes. Only files recorded in the cache index are ever removed, models
+    placed in the directory by other means still count towards the budget.
+
+    Args:
+        destination_dir (str): The models directory to clean up.
+        budget_bytes (int): The maximum total size of the directory.
+        keep (iterable): Origin urls of models that must not be evicted, e.g. the models of the prompt being executed.
+    """
+    with _CACHE_INDEX_LOCK:
+        cache_index = _load_cache_index(destination_dir)
+        total_size = 0
+        candidates = []
+        with os.scandir(destination_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                total_size += stat.st_size
+                if entry.name in cache_index and cache_index[entry.name].get("url") not in keep:
+                    candidates.append((stat.st_atime, entry.name, stat.st_size))
+
+        evicted = False
+        for _, model_filename, size in sorted(candidates):
+            if total_size <= budget_bytes:
+                break
+            logger.info(f"Cache budget of '{destination_dir}' exceeded, removing least recently used '{model_filename}'.")
+            os.remove(os.path.join(destination_dir, model_filename))
+            del cache_index[model_filename]
+            total_size -= size
+            evicted = True
+
+        if evicted:
+            _save_cache_index(destination_dir, cache_index)
+
+
+def _finish_download(part_filepath, model_filepath, model_url, etag, sha256, expected_sha256, drop_page_cache=False, keep=()):
+    """
+    Verifies a completed download against expected_sha256, then moves it in place,
+    records it in the cache index and applies the configured cache budget of its directory,
+    never evicting the models whose urls are in keep.
+    With drop_page_cache, the file is also dropped from the page cache as it isn't loaded yet.
+
+    Returns:
+        bool: False if the download doesn't match expected_sha256 and was discarded.
+    """
+    if expected_sha256 and sha256 != expected_sha256.lower():
+        logger.error(f"SHA256 of '{os.path.basename(model_filepath)}' is {sha256}, expected {expected_sha256}. Discarding the download.")
+        _remove_part(part_filepath)
+        return False
+
+    os.replace(part_filepath, model_filepath)
+    _remove_part(part_filepath)
+    if drop_page_cache:
+        _drop_page_cache(model_filepath)
+
+    destination_dir, model_filename = os.path.split(model_filepath)
+    with _CACHE_INDEX_LOCK:
+        cache_index = _load_cache_index(destination_dir)
+        cache_index[model_filename] = {
+            "url": model_url,
+            "size": os.path.getsize(model_filepath),
+            "etag": etag,
+            "sha256": sha256,
+        }
+        _save_cache_index(destination_dir, cache_index)
+
+    cache_budget_gb = _get_setting_from_config("cache_budget_gb", 0)
+    if cache_budget_gb:
+        _enforce_cache_budget(destination_dir, int(cache_budget_gb * 1024 ** 3), keep={model_url, *keep})
+    return True
+
+
+def _hash_file(filepath, hasher, block_size):
+    """
+    Feeds the content of filepath to hasher, reading block_size bytes at a time.
+    """
+    with open(filepath, 'rb') as f:
+        for data in iter(lambda: f.read(block_size), b''):
+            hasher.update(data)
+    return hasher
+
+
+def _download_model(model_url, model_name, destination_dir, api_key, download_chunks, expected_sha256=None, drop_page_cache=False,
+                    keep=()):
     """
     Handles the download of a model from a given URL to a specified directory.
+
+    The local cache is checked before any network activity, using the filename
+    this url was last downloaded to or the one derived from the url. When that file
+    is missing, a HEAD request resolves the real filename from Content-Disposition,
+    and the body is only requested if that file is missing too.
+
+    Data is written to a '.part' file that is renamed once complete, an interrupted
+    download is resumed with a Range request on the next run. Large models on servers
+    supporting ranges are fetched over several parallel connections.
+
+    The SHA256 of the data is computed while it is written, a download that doesn't
+    match expected_sha256 is discarded.
     
     Args:
         model_url (str): The URL of the model to download.
         model_name (str): The name of the model (for logging purposes).
         destination_dir (str): The directory where the model should be saved.
         api_key (str): API key for authentication, if required.
-        download_chunks (int): The size of download chunks in KB.
+        download_chunks (int): The size of download chunks in MB, DEFAULT_DOWNLOAD_CHUNKS if not set.
+        expected_sha256 (str): The SHA256 the model must match, if known.
+        drop_page_cache (bool): Whether to drop the downloaded file from the page cache, for models not loaded right away.
+        keep (iterable): Urls of models the cache budget must not evict to make room for this one.
         
     Returns:
         str: The full path to the downloaded model file, or None if an error occurred.
     """
+    download_chunks = download_chunks or DEFAULT_DOWNLOAD_CHUNKS
     os.makedirs(destination_dir, exist_ok=True)
 
-    headers = None
+    model_filename = _cached_filename_for_url(destination_dir, model_url) or _filename_from_url(model_url)
+    model_filepath = _cached_model_filepath(destination_dir, model_filename, expected_sha256)
+    if model_filepath:
+        return model_filepath
+
+    # Range offsets and Content-Length must refer to the bytes written to disk, not a compressed encoding
+    headers = {"Accept-Encoding": "identity"}
     if api_key:
         logger.info(f"Using provided API key")
-        headers = {
-            "Authorization": f"Bearer {api_key}"
-        }
+        headers["Authorization"] = f"Bearer {api_key}"
 
+    model_filename = None
+    # Unknown until the server answers, a Range request is harmless if unsupported
+    accept_ranges = True
+    total_size = 0
+    etag = None
     try:
-        response = requests.get(model_url, stream=True, allow_redirects=True, headers=headers)
-        response.raise_for_status()  # Raise an exception for bad status codes
+        head_response = _SESSION.head(model_url, allow_redirects=True, headers=headers)
+        head_response.raise_for_status()
+        model_filename = _filename_from_response(head_response) or _filename_from_url(model_url)
+        accept_ranges = head_response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+        total_size = int(head_response.headers.get('content-length', 0))
+        etag = head_response.headers.get('ETag')
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error making request for '{model_name}' from '{model_url}': {e}")
+        # Some hosts (e.g. pre-signed storage urls) reject HEAD, the GET below still resolves the filename
+        logger.debug(f"HEAD request for '{model_name}' failed, falling back to GET: {e}")
+
+    offset = 0
+    part_etag = None
+    if model_filename:
+        if _cached_model_filepath(destination_dir, model_filename, expected_sha256):
+            return os.path.join(destination_dir, model_filename)
+        model_filepath = os.path.join(destination_dir, model_filename)
+        part_filepath = model_filepath + ".part"
+        part_state = _load_part_state(part_filepath)
+        part_etag = part_state.get("etag")
+        if etag and part_etag and etag != part_etag:
+            logger.warning(f"Remote file of '{model_name}' changed since it was partially downloaded, restarting from scratch.")
+            _remove_part(part_filepath)
+            part_state = {}
+        # Ranges still missing from an interrupted parallel download of this same file
+        pending_ranges = part_state.get("ranges")
+        if pending_ranges is not None and not (accept_ranges and part_state.get("size") == total_size and
+                                               os.path.exists(part_filepath) and os.path.getsize(part_filepath) == total_size):
+            logger.warning(f"Cannot resume download of '{model_name}', restarting from scratch.")
+            _remove_part(part_filepath)
+            pending_ranges = None
+        offset = _resume_offset(part_filepath, accept_ranges)
+
+        block_size = download_chunks * 1024 * 1024
+        download_connections = _get_setting_from_config("download_connections", DEFAULT_DOWNLOAD_CONNECTIONS)
+        # Parallel ranges only pay off when every connection gets at least one full chunk
+        if pending_ranges is not None or (not offset and accept_ranges and download_connections > 1 and
+                                          total_size >= download_connections * block_size):
+            if pending_ranges is not None:
+                logger.info(f"Resuming download of '{model_name}' from '{model_url}' to '{model_filepath}' using {len(pending_ranges)} connections")
+            else:
+                logger.info(f"Downloading '{model_name}' from '{model_url}' to '{model_filepath}' using {download_connections} connections")
+            try:
+                _download_ranges(model_url, model_name, headers, part_filepath, total_size, download_connections, block_size,
+                                 etag, pending_ranges)
+            except Exception as e:
+                logger.error(f"An unexpected error occurred during download of '{model_name}': {e}. It will be resumed on the next run.")
+                return None
+            try:
+                # Ranges complete out of order, hashing needs a second pass over the file
+                sha256 = None
+                if expected_sha256:
+                    sha256 = _hash_file(part_filepath, hashlib.sha256(), block_size).hexdigest()
+                if not _finish_download(part_filepath, model_filepath, model_url, etag, sha256, expected_sha256, drop_page_cache, keep):
+                    return None
+                logger.info(f"Successfully downloaded '{model_name}' filename {model_filename}.")
+                return model_filepath
+            except Exception as e:
+                logger.error(f"An unexpected error occurred during download of '{model_name}': {e}")
+                return None
+
+    response = _request_model(model_url, model_name, headers, offset, part_etag if offset else None)
+    if response is None:
         return None
 
-    model_filename = None
-    content_disposition = response.headers.get('Content-Disposition')
-    if content_disposition:
-        filename_match = re.search(r'filename="?([^"]+)"?', content_disposition)
-        if filename_match:
-            model_filename = filename_match.group(1).strip()
-    
     if not model_filename:
         # Fallback to extracting filename from URL if Content-Disposition is missing or malformed
-        model_filename = os.path.basename(model_url)
+        model_filename = _filename_from_response(response) or _filename_from_url(model_url)
+        model_filepath = os.path.join(destination_dir, model_filename)
 
-    model_filepath = os.path.join(destination_dir, model_filename)
+        if _cached_model_filepath(destination_dir, model_filename, expected_sha256):
+            response.close()
+            return model_filepath
 
-    if os.path.exists(model_filepath):
-        logger.info(f"File '{model_filename}' already exists at '{model_filepath}'. Skipping download.")
-        return model_filepath
-    else:
-        logger.info(f"Downloading '{model_name}' from '{model_url}' to '{model_filepath}'")
+        offset = _resume_offset(model_filepath + ".part", response.headers.get('Accept-Ranges', '').lower() == 'bytes')
+        if offset:
+            response.close()
+            response = _request_model(model_url, model_name, headers, offset, _load_part_state(model_filepath + ".part").get("etag"))
+            if response is None:
+                return None
+
+    part_filepath = model_filepath + ".part"
+    with response:
+        if response.status_code == 206:
+            logger.info(f"Resuming download of '{model_name}' from '{model_url}' to '{model_filepath}' at byte {offset}")
+            mode = 'ab'
+        else:
+            logger.info(f"Downloading '{model_name}' from '{model_url}' to '{model_filepath}'")
+            mode = 'wb'
+            offset = 0
         try:
-            total_size = int(response.headers.get('content-length', 0))
-            block_size = download_chunks * 1024
-            with tqdm(total=total_size, unit='iB', unit_scale=True, desc=f"{LOG_PREFIX} Downloading {model_name}") as progress_bar:
-                with open(model_filepath, 'wb') as f:
-                    for data in response.iter_content(block_size):
-                        progress_bar.update(len(data))
-                        f.write(data)
+            remaining_size = int(response.headers.get('content-length', 0))
+            if mode == 'wb':
+                # Remembered so a later resume only appends bytes of the same remote file
+                _save_part_state(part_filepath, {"etag": response.headers.get('ETag') or etag})
+            block_size = download_chunks * 1024 * 1024
+            downloaded_size = 0
+            hasher = hashlib.sha256()
+            if mode == 'ab':
+                _hash_file(part_filepath, hasher, block_size)
+            with _progress_bar(offset + remaining_size, model_name, initial=offset) as progress_bar:
+                with open(part_filepath, mode, buffering=WRITE_BUFFER_SIZE) as f:
+                    preallocated = mode == 'wb' and remaining_size and _preallocate(f, remaining_size)
+                    try:
+                        for data in response.iter_content(block_size):
+                            progress_bar.update(len(data))
+                            hasher.update(data)
+                            f.write(data)
+                            downloaded_size += len(data)
+                    finally:
+                        if preallocated:
+                            # Keep the partial file resumable, its size must be the number of bytes received
+                            f.truncate(downloaded_size)
+            if remaining_size and downloaded_size != remaining_size:
+                logger.error(f"Download of '{model_name}' is incomplete ({offset + downloaded_size} of {offset + remaining_size} bytes), it will be resumed on the next run.")
+                return None
+            if not _finish_download(part_filepath, model_filepath, model_url, etag or response.headers.get('ETag'), hasher.hexdigest(), expected_sha256,
+                                    drop_page_cache, keep):
+                return None
             logger.info(f"Successfully downloaded '{model_name}' filename {model_filename}.")
             return model_filepath
         except Exception as e:
             logger.error(f"An unexpected error occurred during download of '{model_name}': {e}")
             return None
 
+def _build_config_index(config):
+    """
+    Builds a {model_type_key: {name: model}} lookup from a loaded configuration.
+    Dict insertion order keeps the model order of the configuration file.
+    Entries that aren't models with a name, e.g. a list of notes, are skipped.
+    """
+    return {
+        key: {model["name"]: model for model in models if isinstance(model, dict) and "name" in model}
+        for key, models in config.items() if isinstance(models, list)
+    }
+
+def _reload_config():
+    """
+    Reloads the configuration file if it changed and rebuilds the name to model lookup,
+    so models added to config.json are available without restarting ComfyUI.
+    """
+    global NODE_CONFIG, NODE_CONFIG_INDEX, NODE_CONFIG_NAMES
+    config = load_config()
+    if config is not NODE_CONFIG:
+        NODE_CONFIG = config
+        NODE_CONFIG_INDEX = _build_config_index(NODE_CONFIG)
+        # Dropdown options, ComfyUI only treats list inputs as combos so these can't be tuples
+        NODE_CONFIG_NAMES = {key: list(models) for key, models in NODE_CONFIG_INDEX.items()}
+
+def _get_model_names_from_config(model_type_key):
+    """
+    Reloads the configuration and returns the model names for a given model type.
+    The same list is returned until the configuration file changes.
+    """
+    _reload_config()
+    return NODE_CONFIG_NAMES.get(model_type_key, [])
+
+def _get_setting_from_config(setting_key, default):
+    """
+    Retrieves a top level setting from the NODE_CONFIG, or default if it isn't set.
+    """
+    return NODE_CONFIG.get(setting_key, default)
+
 def _get_model_url_from_config(model_name, model_type_key):
     """
     Retrieves the URL for a given model name from the NODE_CONFIG.
     """
-    model_url = None
-    for model in NODE_CONFIG.get(model_type_key, []):
-        if model["name"] == model_name:
-            model_url = model["url"]
-            break
+    model_url = NODE_CONFIG_INDEX.get(model_type_key, {}).get(model_name, {}).get("url")
     if not model_url:
         logger.error(f"Model URL not found for name: {model_name} in {model_type_key}")
     return model_url
 
-NODE_CONFIG = load_config()
+def _get_model_sha256_from_config(model_name, model_type_key):
+    """
+    Retrieves the expected SHA256 of a given model name from the NODE_CONFIG, if configured.
+    """
+    return NODE_CONFIG_INDEX.get(model_type_key, {}).get(model_name, {}).get("sha256")
+
+def _is_model_cached(destination_dir, model_url):
+    """
+    Cheaply checks, without any network activity, whether model_url is already downloaded.
+    """
+    model_filename = _cached_filename_for_url(destination_dir, model_url) or _filename_from_url(model_url)
+    return os.path.exists(os.path.join(destination_dir, model_filename))
+
+def _execution_order(prompt):
+    """
+    Returns the node ids of a prompt with every node after the nodes its inputs are linked to,
+    which approximates the order ComfyUI executes them in.
+    """
+    order = []
+    visited = set()
+    for root_id in prompt:
+        stack = [(root_id, False)]
+        while stack:
+            node_id, inputs_done = stack.pop()
+            if inputs_done:
+                order.append(node_id)
+                continue
+            if node_id in visited or node_id not in prompt:
+                continue
+            visited.add(node_id)
+            stack.append((node_id, True))
+            # Links are [node_id, output_index] pairs
+            for value in reversed(list(prompt[node_id].get("inputs", {}).values())):
+                if isinstance(value, list) and len(value) == 2 and isinstance(value[0], str):
+                    stack.append((value[0], False))
+    return order
+
+def _prompt_models(prompt):
+    """
+    Yields (node_id, inputs, model_name, model_type_key, model_url, destination_dir) for every
+    OnDemand node of a prompt whose model is known before execution, in execution order.
+    """
+    prompt = prompt or {}
+    for node_id in _execution_order(prompt):
+        node = prompt[node_id]
+        target = _PREFETCH_TARGETS.get(node.get("class_type"))
+        if not target:
+            continue
+        name_input, model_type_key, models_subdir = target
+        inputs = node.get("inputs", {})
+        model_name = inputs.get(name_input)
+        # Inputs linked to other nodes are only known at execution time
+        if not isinstance(model_name, str):
+            continue
+        model_url = NODE_CONFIG_INDEX.get(model_type_key, {}).get(model_name, {}).get("url")
+        if not model_url:
+            continue
+        yield node_id, inputs, model_name, model_type_key, model_url, os.path.join(folder_paths.models_dir, models_subdir)
+
+def _prefetch_prompt_models(prompt, unique_id=None, keep=()):
+    """
+    Starts background downloads of the models used by the OnDemand nodes of a prompt that
+    haven't run yet, so they are transferred while the current model is loaded and used.
+    At most PREFETCH_WORKERS downloads run at the same time.
+
+    Args:
+        prompt (dict): The prompt being executed, as provided by the hidden PROMPT input.
+        unique_id (str): The id of the node that just ran, as provided by the hidden UNIQUE_ID input.
+        keep (iterable): Urls of the models of the prompt, the cache budget must not evict them.
+    """
+    with _INFLIGHT_LOCK:
+        # ComfyUI passes the same prompt object to every node of an execution
+        if _EXECUTED_NODES["prompt"] is not prompt:
+            _EXECUTED_NODES["prompt"] = prompt
+            _EXECUTED_NODES["node_ids"] = set()
+        _EXECUTED_NODES["node_ids"].add(unique_id)
+        executed_node_ids = set(_EXECUTED_NODES["node_ids"])
+
+    for node_id, inputs, model_name, model_type_key, model_url, destination_dir in _prompt_models(prompt):
+        # A node that already ran has loaded its model, fetching it again would only evict another one
+        if node_id in executed_node_ids:
+            continue
+        with _INFLIGHT_LOCK:
+            if model_url in _INFLIGHT or _is_model_cached(destination_dir, model_url):
+                continue
+            future = Future()
+            _INFLIGHT[model_url] = future
+
+        api_key = inputs.get("api_key") if isinstance(inputs.get("api_key"), str) else None
+        api_key = _get_api_key_for_url(model_url, api_key)
+        download_chunks = inputs.get("download_chunks") if isinstance(inputs.get("download_chunks"), int) else DEFAULT_DOWNLOAD_CHUNKS
+        expected_sha256 = _get_model_sha256_from_config(model_name, model_type_key)
+
+        def prefetch(future, model_url, model_name, destination_dir, api_key, download_chunks, expected_sha256):
+            with _PREFETCH_SLOTS:
+                # Cancelled while queued, the node needing this model downloads it itself
+                if not future.set_running_or_notify_cancel():
+                    return
+                try:
+                    future.set_result(_download_model(model_url, model_name, destination_dir, api_key, download_chunks, expected_sha256,
+                                                      drop_page_cache=True, keep=keep))
+                except Exception as e:
+                    logger.error(f"An unexpected error occurred while prefetching '{model_name}': {e}")
+                    future.set_exception(e)
+                finally:
+                    with _INFLIGHT_LOCK:
+                        if _INFLIGHT.get(model_url) is future:
+                            del _INFLIGHT[model_url]
+
+        logger.info(f"Prefetching '{model_name}' in background")
+        # Daemon threads don't hold up ComfyUI shutdown, an interrupted download is resumed later
+        threading.Thread(target=prefetch, daemon=True,
+                         args=(future, model_url, model_name, destination_dir, api_key, download_chunks, expected_sha256)).start()
+
+def _download_from_config(model_name, model_type_key, models_subdir, api_key, download_chunks, prompt=None, unique_id=None):
+    """
+    Resolves a configured model by name and downloads it into its ComfyUI models folder if missing.
+    The models of the OnDemand nodes of the prompt that haven't run yet are then prefetched in background.
+    The cache budget never evicts a model of the prompt to make room for another one.
+
+    Args:
+        model_name (str): The name of the model, as listed in the configuration.
+        model_type_key (str): The configuration key listing this kind of model (e.g. "loras").
+        models_subdir (str): The folder inside the ComfyUI models directory (e.g. "loras").
+        api_key (str): API key provided to the node, if any.
+        download_chunks (int): The size of download chunks in MB.
+        prompt (dict): The prompt being executed, if provided by ComfyUI.
+        unique_id (str): The id of the node being executed, if provided by ComfyUI.
+
+    Returns:
+        str: The filename of the model inside models_subdir, or None if an error occurred.
+    """
+    model_url = _get_model_url_from_config(model_name, model_type_key)
+    if not model_url:
+        return None
+
+    with _INFLIGHT_LOCK:
+        inflight = _INFLIGHT.get(model_url)
+        # A prefetch still queued behind other ones is taken over, the model is needed now
+        if inflight and inflight.cancel():
+            del _INFLIGHT[model_url]
+            inflight = None
+    if inflight:
+        logger.info(f"Waiting for background download of '{model_name}'")
+        # A failed prefetch is logged by its thread, the download below then retries or resumes it
+        wait([inflight])
+
+    api_key = _get_api_key_for_url(model_url, api_key)
+
+    expected_sha256 = _get_model_sha256_from_config(model_name, model_type_key)
+
+    # Resolved to filenames through the cache index at eviction time, so concurrent prefetches are covered too
+    keep = {model_url, *(prompt_model[4] for prompt_model in _prompt_models(prompt))}
+
+    destination_dir = os.path.join(folder_paths.models_dir, models_subdir)
+    model_filepath = _download_model(model_url, model_name, destination_dir, api_key, download_chunks, expected_sha256, keep=keep)
+
+    _prefetch_prompt_models(prompt, unique_id, keep)
+
+    if not model_filepath:
+        return None
+
+    _prefetch_model(model_filepath)
+    return os.path.basename(model_filepath)
+
+NODE_CONFIG = None
+NODE_CONFIG_INDEX = {}
+NODE_CONFIG_NAMES = {}
+_reload_config()
+
+# Background downloads by model url, see _prefetch_prompt_models
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+_PREFETCH_SLOTS = threading.Semaphore(PREFETCH_WORKERS)
+# The prompt being executed and the ids of its OnDemand nodes that already ran
+_EXECUTED_NODES = {"prompt": None, "node_ids": set()}
+
+# Node class_type: (model name input, configuration key, models folder)
+_PREFETCH_TARGETS = {
+    "OnDemandLoraLoader": ("lora_name", "loras", "loras"),
+    "OnDemandUNETLoader": ("unet_name", "diffusion_models", "diffusion_models"),
+    "OnDemandCheckpointLoader": ("ckpt_name", "checkpoints", "checkpoints"),
+    "OnDemandVAELoader": ("vae_name", "vae_models", "vae"),
+    "OnDemandCLIPLoader": ("clip_name", "clip_models", "text_encoders"),
+    "OnDemandGGUFLoader": ("unet_name", "gguf_models", "unet"),
+    "OnDemandControlNetLoader": ("control_net_name", "controlnet_models", "controlnet"),
+}
 
 class OnDemandLoraLoader:
 
     @classmethod
     def INPUT_TYPES(cls):
 
-        NODE_CONFIG = load_config()
-        loras = [lora["name"] for lora in NODE_CONFIG.get("loras", []) ]
+        loras = _get_model_names_from_config("loras")
        
         return {
             "required": {
@@ -205,7 +1051,11 @@ class OnDemandLoraLoader:
             "optional": {
                 "clip": ("CLIP", ),
                 "api_key": ("STRING", {"default": None, "multiline": False}),
-                "download_chunks": ("INT", {"default": 4, "min": 1, "max": 12, "step": 1})
+                "download_chunks": ("INT", {"default": DEFAULT_DOWNLOAD_CHUNKS, "min": 1, "max": 64, "step": 1, "tooltip": "Size of each download chunk in MB."})
+            },
+            "hidden": {
+                "prompt": "PROMPT",
+                "unique_id": "UNIQUE_ID"
             }
         }
 
@@ -216,25 +1066,18 @@ class OnDemandLoraLoader:
 
     CATEGORY = "loaders"
 
-    def download_lora(self, model, lora_name, strength_model, strength_clip, clip=None, api_key=None, download_chunks=None):
-        self.lora_loader = LoraLoader()
-
-        destination_dir = os.path.join(folder_paths.models_dir, "loras")
+    _lora_loader = None
 
-        lora_url = _get_model_url_from_config(lora_name, "loras")
-        if not lora_url:
-            return model, clip # Return original model/clip if URL not found
+    def download_lora(self, model, lora_name, strength_model, strength_clip, clip=None, api_key=None, download_chunks=None, prompt=None, unique_id=None):
+        if OnDemandLoraLoader._lora_loader is None:
+            OnDemandLoraLoader._lora_loader = LoraLoader()
 
-        api_key = _get_api_key_for_url(lora_url, api_key)
-
-        lora_filepath = _download_model(lora_url, lora_name, destination_dir, api_key, download_chunks)
-        if not lora_filepath:
-            return model, clip # Return original model/clip if download fails
-
-        lora_filename = os.path.basename(lora_filepath)
+        lora_filename = _download_from_config(lora_name, "loras", "loras", api_key, download_chunks, prompt, unique_id)
+        if not lora_filename:
+            return model, clip # Return original model/clip if URL not found or download fails
 
         # Load the LORA using the existing LoraLoader
-        model_lora, clip_lora = self.lora_loader.load_lora(model, clip, lora_filename, strength_model, strength_clip)
+        model_lora, clip_lora = OnDemandLoraLoader._lora_loader.load_lora(model, clip, lora_filename, strength_model, strength_clip)
         return model_lora, clip_lora
 
 
@@ -243,8 +1086,7 @@ class OnDemandUNETLoader:
     @classmethod
     def INPUT_TYPES(cls):
 
-        NODE_CONFIG = load_config()
-        models = [model["name"] for model in NODE_CONFIG.get("diffusion_models", []) ]
+        models = _get_model_names_from_config("diffusion_models")
        
         return {
             "required": {
@@ -253,7 +1095,11 @@ class OnDemandUNETLoader:
             },
             "optional": {
                 "api_key": ("STRING", {"default": None, "multiline": False}),
-                "download_chunks": ("INT", {"default": 4, "min": 1, "max": 12, "step": 1})
+                "download_chunks": ("INT", {"default": DEFAULT_DOWNLOAD_CHUNKS, "min": 1, "max": 64, "step": 1, "tooltip": "Size of each download chunk in MB."})
+            },
+            "hidden": {
+                "prompt": "PROMPT",
+                "unique_id": "UNIQUE_ID"
             }
         }
 
@@ -263,25 +1109,18 @@ class OnDemandUNETLoader:
 
     CATEGORY = "loaders"
 
-    def download_unet(self, unet_name, weight_dtype, api_key=None, download_chunks=None):
-        self.unet_loader = UNETLoader()
-
-        destination_dir = os.path.join(folder_paths.models_dir, "diffusion_models")
+    _unet_loader = None
 
-        model_url = _get_model_url_from_config(unet_name, "diffusion_models")
-        if not model_url:
-            return None
-
-        api_key = _get_api_key_for_url(model_url, api_key)
+    def download_unet(self, unet_name, weight_dtype, api_key=None, download_chunks=None, prompt=None, unique_id=None):
+        if OnDemandUNETLoader._unet_loader is None:
+            OnDemandUNETLoader._unet_loader = UNETLoader()
 
-        model_filepath = _download_model(model_url, unet_name, destination_dir, api_key, download_chunks)
-        if not model_filepath:
+        model_filename = _download_from_config(unet_name, "diffusion_models", "diffusion_models", api_key, download_chunks, prompt, unique_id)
+        if not model_filename:
             return None
 
-        model_filename = os.path.basename(model_filepath)
-
         # Load the Model using the existing UNETLoader
-        model_output = self.unet_loader.load_unet(model_filename, weight_dtype)
+        model_output = OnDemandUNETLoader._unet_loader.load_unet(model_filename, weight_dtype)
         return model_output
 
 
@@ -290,8 +1129,7 @@ class OnDemandCheckpointLoader:
     @classmethod
     def INPUT_TYPES(cls):
 
-        NODE_CONFIG = load_config()
-        models = [model["name"] for model in NODE_CONFIG.get("checkpoints", []) ]
+        models = _get_model_names_from_config("checkpoints")
        
         return {
             "required": {
@@ -299,7 +1137,11 @@ class OnDemandCheckpointLoader:
             },
             "optional": {
                 "api_key": ("STRING", {"default": None, "multiline": False}),
-                "download_chunks": ("INT", {"default": 4, "min": 1, "max": 12, "step": 1})
+                "download_chunks": ("INT", {"default": DEFAULT_DOWNLOAD_CHUNKS, "min": 1, "max": 64, "step": 1, "tooltip": "Size of each download chunk in MB."})
+            },
+            "hidden": {
+                "prompt": "PROMPT",
+                "unique_id": "UNIQUE_ID"
             }
         }
 
@@ -311,33 +1153,25 @@ class OnDemandCheckpointLoader:
     DESCRIPTION = "Load checkpoint models from CivitAI/HuggingFace, they will be downloaded automatically if not found.\nPut a valid CivitAI/HuggingFace API key in form field 'api_key' or in CIVITAI_TOKEN/HUGGINGFACE_TOKEN environment variable to access private models"
     CATEGORY = "loaders"
 
-    def download_checkpoint(self, ckpt_name, api_key=None, download_chunks=None):
-        self.checkpoint_loader = CheckpointLoaderSimple()
+    _checkpoint_loader = None
 
-        destination_dir = os.path.join(folder_paths.models_dir, "checkpoints")
+    def download_checkpoint(self, ckpt_name, api_key=None, download_chunks=None, prompt=None, unique_id=None):
+        if OnDemandCheckpointLoader._checkpoint_loader is None:
+            OnDemandCheckpointLoader._checkpoint_loader = CheckpointLoaderSimple()
 
-        model_url = _get_model_url_from_config(ckpt_name, "checkpoints")
-        if not model_url:
-            return None
-
-        api_key = _get_api_key_for_url(model_url, api_key)
-
-        model_filepath = _download_model(model_url, ckpt_name, destination_dir, api_key, download_chunks)
-        if not model_filepath:
-            return None, None, None # Return None for all outputs if download fails
-
-        model_filename = os.path.basename(model_filepath)
+        model_filename = _download_from_config(ckpt_name, "checkpoints", "checkpoints", api_key, download_chunks, prompt, unique_id)
+        if not model_filename:
+            return None, None, None
 
         # Load the checkpoint using the existing CheckpointLoaderSimple
-        return self.checkpoint_loader.load_checkpoint(model_filename)
+        return OnDemandCheckpointLoader._checkpoint_loader.load_checkpoint(model_filename)
 
 class OnDemandVAELoader:
     
     @classmethod
     def INPUT_TYPES(cls):
 
-        NODE_CONFIG = load_config()
-        models = [model["name"] for model in NODE_CONFIG.get("vae_models", []) ]
+        models = _get_model_names_from_config("vae_models")
        
         return {
             "required": {
@@ -345,7 +1179,11 @@ class OnDemandVAELoader:
             },
             "optional": {
                 "api_key": ("STRING", {"default": None, "multiline": False}),
-                "download_chunks": ("INT", {"default": 4, "min": 1, "max": 12, "step": 1})
+                "download_chunks": ("INT", {"default": DEFAULT_DOWNLOAD_CHUNKS, "min": 1, "max": 64, "step": 1, "tooltip": "Size of each download chunk in MB."})
+            },
+            "hidden": {
+                "prompt": "PROMPT",
+                "unique_id": "UNIQUE_ID"
             }
         }
 
@@ -354,33 +1192,25 @@ class OnDemandVAELoader:
     DESCRIPTION = "Load vae models from CivitAI/HuggingFace, they will be downloaded automatically if not found.\nPut a valid CivitAI/HuggingFace API key in form field 'api_key' or in CIVITAI_TOKEN/HUGGINGFACE_TOKEN environment variable to access private models"
     CATEGORY = "loaders"
 
-    def download_vae(self, vae_name, api_key=None, download_chunks=None):
-        self.vae_loader = VAELoader()
-
-        destination_dir = os.path.join(folder_paths.models_dir, "vae")
-
-        model_url = _get_model_url_from_config(vae_name, "vae_models")
-        if not model_url:
-            return None
-
-        api_key = _get_api_key_for_url(model_url, api_key)
+    _vae_loader = None
 
-        model_filepath = _download_model(model_url, vae_name, destination_dir, api_key, download_chunks)
-        if not model_filepath:
-            return None, None, None # Return None for all outputs if download fails
+    def download_vae(self, vae_name, api_key=None, download_chunks=None, prompt=None, unique_id=None):
+        if OnDemandVAELoader._vae_loader is None:
+            OnDemandVAELoader._vae_loader = VAELoader()
 
-        model_filename = os.path.basename(model_filepath)
+        model_filename = _download_from_config(vae_name, "vae_models", "vae", api_key, download_chunks, prompt, unique_id)
+        if not model_filename:
+            return None, None, None
 
         # Load vae using the existing VAELoader
-        return self.vae_loader.load_vae(model_filename)
+        return OnDemandVAELoader._vae_loader.load_vae(model_filename)
 
 class OnDemandCLIPLoader:
 
     @classmethod
     def INPUT_TYPES(s):
 
-        NODE_CONFIG = load_config()
-        models = [model["name"] for model in NODE_CONFIG.get("clip_models", []) ]
+        models = _get_model_names_from_config("clip_models")
 
         return {"required": { 
                                 "clip_name": (models,),
@@ -389,32 +1219,29 @@ class OnDemandCLIPLoader:
                 "optional": {
                                 "device": (["default", "cpu"], {"advanced": True}),
                                 "api_key": ("STRING", {"default": None, "multiline": False}),
-                                "download_chunks": ("INT", {"default": 4, "min": 1, "max": 12, "step": 1})
+                                "download_chunks": ("INT", {"default": DEFAULT_DOWNLOAD_CHUNKS, "min": 1, "max": 64, "step": 1, "tooltip": "Size of each download chunk in MB."})
+                             },
+                "hidden": {
+                                "prompt": "PROMPT",
+                                "unique_id": "UNIQUE_ID"
                              }}
     RETURN_TYPES = ("CLIP",)
     FUNCTION = "download_clip"
     CATEGORY = "loaders"
     DESCRIPTION = "Load clip models from CivitAI/HuggingFace, they will be downloaded automatically if not found.\nPut a valid CivitAI/HuggingFace API key in form field 'api_key' or in CIVITAI_TOKEN/HUGGINGFACE_TOKEN environment variable to access private models"
 
-    def download_clip(self, clip_name, type="stable_diffusion", device="default", api_key=None, download_chunks=None):
-        self.clip_loader = CLIPLoader()
-
-        destination_dir = os.path.join(folder_paths.models_dir, "text_encoders")
+    _clip_loader = None
 
-        model_url = _get_model_url_from_config(clip_name, "clip_models")
-        if not model_url:
-            return None
-
-        api_key = _get_api_key_for_url(model_url, api_key)
+    def download_clip(self, clip_name, type="stable_diffusion", device="default", api_key=None, download_chunks=None, prompt=None, unique_id=None):
+        if OnDemandCLIPLoader._clip_loader is None:
+            OnDemandCLIPLoader._clip_loader = CLIPLoader()
 
-        model_filepath = _download_model(model_url, clip_name, destination_dir, api_key, download_chunks)
-        if not model_filepath:
+        model_filename = _download_from_config(clip_name, "clip_models", "text_encoders", api_key, download_chunks, prompt, unique_id)
+        if not model_filename:
             return None
 
-        model_filename = os.path.basename(model_filepath)
-
         # Load the checkpoint using the existing CheckpointLoaderSimple
-        return self.clip_loader.load_clip(model_filename, type, device)
+        return OnDemandCLIPLoader._clip_loader.load_clip(model_filename, type, device)
     
 
 
@@ -423,52 +1250,47 @@ class OnDemandGGUFLoader:
     @classmethod
     def INPUT_TYPES(s):
 
-        NODE_CONFIG = load_config()
-        models = [model["name"] for model in NODE_CONFIG.get("gguf_models", []) ]
+        models = _get_model_names_from_config("gguf_models")
 
         return {"required": { 
                                 "unet_name": (models,)                        
                               },
                 "optional": {
                                 "api_key": ("STRING", {"default": None, "multiline": False}),
-                                "download_chunks": ("INT", {"default": 4, "min": 1, "max": 12, "step": 1})
+                                "download_chunks": ("INT", {"default": DEFAULT_DOWNLOAD_CHUNKS, "min": 1, "max": 64, "step": 1, "tooltip": "Size of each download chunk in MB."})
+                             },
+                "hidden": {
+                                "prompt": "PROMPT",
+                                "unique_id": "UNIQUE_ID"
                              }}
     RETURN_TYPES = ("MODEL",)
     FUNCTION = "download_unet"
     CATEGORY = "loaders"
     DESCRIPTION = "Load gguf models from CivitAI/HuggingFace, they will be downloaded automatically if not found.\nPut a valid CivitAI/HuggingFace API key in form field 'api_key' or in CIVITAI_TOKEN/HUGGINGFACE_TOKEN environment variable to access private models"
 
-    def download_unet(self, unet_name, api_key=None, download_chunks=None):
+    _gguf_loader = None
+
+    def download_unet(self, unet_name, api_key=None, download_chunks=None, prompt=None, unique_id=None):
         if module_gguf is None:
             logger.error(f"UnetLoaderGGUF class not available. Ensure ComfyUI-GGUF is installed correctly.")
             return None
         
-        self.gguf_loader = module_gguf.nodes.UnetLoaderGGUF()
-
-        destination_dir = os.path.join(folder_paths.models_dir, "unet")
-
-        model_url = _get_model_url_from_config(unet_name, "gguf_models")
-        if not model_url:
-            return None
-
-        api_key = _get_api_key_for_url(model_url, api_key)
+        if OnDemandGGUFLoader._gguf_loader is None:
+            OnDemandGGUFLoader._gguf_loader = module_gguf.nodes.UnetLoaderGGUF()
 
-        model_filepath = _download_model(model_url, unet_name, destination_dir, api_key, download_chunks)
-        if not model_filepath:
+        model_filename = _download_from_config(unet_name, "gguf_models", "unet", api_key, download_chunks, prompt, unique_id)
+        if not model_filename:
             return None
 
-        model_filename = os.path.basename(model_filepath)
-
         # Load the gguf using the existing UnetLoaderGGUF
-        return self.gguf_loader.load_unet(model_filename)
+        return OnDemandGGUFLoader._gguf_loader.load_unet(model_filename)
 
 class OnDemandControlNetLoader:
     
     @classmethod
     def INPUT_TYPES(cls):
 
-        NODE_CONFIG = load_config()
-        models = [model["name"] for model in NODE_CONFIG.get("controlnet_models", []) ]
+        models = _get_model_names_from_config("controlnet_models")
        
         return {
             "required": {
@@ -476,7 +1298,11 @@ class OnDemandControlNetLoader:
             },
             "optional": {
                 "api_key": ("STRING", {"default": None, "multiline": False}),
-                "download_chunks": ("INT", {"default": 4, "min": 1, "max": 12, "step": 1})
+                "download_chunks": ("INT", {"default": DEFAULT_DOWNLOAD_CHUNKS, "min": 1, "max": 64, "step": 1, "tooltip": "Size of each download chunk in MB."})
+            },
+            "hidden": {
+                "prompt": "PROMPT",
+                "unique_id": "UNIQUE_ID"
             }
         }
 
@@ -485,22 +1311,15 @@ class OnDemandControlNetLoader:
     DESCRIPTION = "Load control_net models from CivitAI/HuggingFace, they will be downloaded automatically if not found.\nPut a valid CivitAI/HuggingFace API key in form field 'api_key' or in CIVITAI_TOKEN/HUGGINGFACE_TOKEN environment variable to access private models"
     CATEGORY = "loaders"
 
-    def download_controlnet(self, control_net_name, api_key=None, download_chunks=None):
-        self.controlnet_loader = ControlNetLoader()
+    _controlnet_loader = None
 
-        destination_dir = os.path.join(folder_paths.models_dir, "controlnet")
+    def download_controlnet(self, control_net_name, api_key=None, download_chunks=None, prompt=None, unique_id=None):
+        if OnDemandControlNetLoader._controlnet_loader is None:
+            OnDemandControlNetLoader._controlnet_loader = ControlNetLoader()
 
-        model_url = _get_model_url_from_config(control_net_name, "controlnet_models")
-        if not model_url:
+        model_filename = _download_from_config(control_net_name, "controlnet_models", "controlnet", api_key, download_chunks, prompt, unique_id)
+        if not model_filename:
             return None
 
-        api_key = _get_api_key_for_url(model_url, api_key)
-
-        model_filepath = _download_model(model_url, control_net_name, destination_dir, api_key, download_chunks)
-        if not model_filepath:
-            return None # Return None for all outputs if download fails
-
-        model_filename = os.path.basename(model_filepath)
-
         # Load vae using the existing VAELoader
-        return self.controlnet_loader.load_controlnet(model_filename)
+        return OnDemandControlNetLoader._controlnet_loader.load_controlnet(model_filename)